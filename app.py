@@ -1,70 +1,132 @@
 import streamlit as st
-import yaml
 from pathlib import Path
-from utils.yaml_manager import YAMLManager
+from utils.yaml_manager import YAMLManager, _yaml
 import json
 from typing import Dict, List
 
-# Initialize session state
-if 'yaml_manager' not in st.session_state:
-    st.session_state.yaml_manager = YAMLManager('dbt_configs')
+# PyYAML is imported lazily through _yaml() so session startup does not pay
+# for the import until something is actually parsed or emitted.
+
+@st.cache_resource
+def get_yaml_manager() -> YAMLManager:
+    """Shared YAMLManager instance, reused across sessions and reruns."""
+    return YAMLManager('dbt_configs')
+
+@st.cache_data
+def load_config(path_str: str, mtime_ns: int) -> Dict:
+    """Load a config file, memoized by path and mtime across reruns.
+
+    The mtime argument is part of the cache key so the entry invalidates
+    automatically when the file changes on disk.
+    """
+    return get_yaml_manager().load_yaml(path_str)
+
+@st.cache_data
+def parse_custom_props(text: str):
+    """Parse the custom-properties textarea, trying JSON before YAML.
+
+    Most pastes are JSON-compatible and json.loads is far cheaper than a
+    YAML parse; identical input is memoized so reruns don't re-parse it.
+    """
+    try:
+        return json.loads(text)
+    except ValueError:
+        pass
+    yaml, loader, _ = _yaml()
+    try:
+        return yaml.load(text, Loader=loader)
+    except yaml.YAMLError as e:
+        raise ValueError(f"Error parsing YAML: {e}")
+
+@st.cache_data
+def dump_yaml(frozen: str) -> str:
+    """Emit YAML for a JSON-frozen config, memoized on the frozen form."""
+    yaml, _, dumper = _yaml()
+    return yaml.dump(json.loads(frozen), Dumper=dumper, sort_keys=False, indent=2)
 
 def display_yaml(data):
     """Display YAML data in a formatted way."""
-    st.code(yaml.dump(data, sort_keys=False, indent=2), language='yaml')
+    try:
+        # Freeze to JSON so identical configs hit the dump cache across
+        # reruns; key order is preserved, so the output is unchanged.
+        text = dump_yaml(json.dumps(data))
+    except TypeError:
+        # Non-JSON-serializable values (rare); dump directly.
+        yaml, _, dumper = _yaml()
+        text = yaml.dump(data, Dumper=dumper, sort_keys=False, indent=2)
+    st.code(text, language='yaml')
+
+def create_column_config(idx: int):
+    """Render the widgets for the column at position ``idx``.
 
-def create_column_config():
-    """Create a configuration for a single column."""
-    col = {}
+    Values live in session state under index-keyed slots; the column dicts
+    are assembled from those slots in one pass by collect_columns.
+    """
     col1, col2 = st.columns([3, 1])
-    
+
     with col1:
-        col["name"] = st.text_input("Column Name", key=f"col_name_{st.session_state.get('col_counter', 0)}")
+        st.text_input("Column Name", key=f"col_name_{idx}")
     with col2:
-        col["tests"] = st.multiselect(
+        st.multiselect(
             "Tests",
             ["unique", "not_null", "positive", "relationships"],
-            key=f"col_tests_{st.session_state.get('col_counter', 0)}"
+            key=f"col_tests_{idx}"
         )
-    
-    col["description"] = st.text_area(
+
+    st.text_area(
         "Column Description",
-        key=f"col_desc_{st.session_state.get('col_counter', 0)}"
+        key=f"col_desc_{idx}"
     )
 
     # Advanced column properties
     with st.expander("Advanced Column Properties"):
-        if st.checkbox("Add Relationships", key=f"col_rel_check_{st.session_state.get('col_counter', 0)}"):
-            ref_to = st.text_input(
+        if st.checkbox("Add Relationships", key=f"col_rel_check_{idx}"):
+            st.text_input(
                 "References To (format: model_name.column_name)",
-                key=f"col_ref_{st.session_state.get('col_counter', 0)}"
+                key=f"col_ref_{idx}"
             )
-            if ref_to:
-                if "tests" not in col:
-                    col["tests"] = []
-                if isinstance(col["tests"], list):
-                    col["tests"].append({
-                        "relationships": {
-                            "to": ref_to,
-                            "field": col["name"]
-                        }
-                    })
-
-        if st.checkbox("Add Custom Tests", key=f"col_custom_check_{st.session_state.get('col_counter', 0)}"):
-            custom_test = st.text_input(
+
+        if st.checkbox("Add Custom Tests", key=f"col_custom_check_{idx}"):
+            st.text_input(
                 "Custom Test Name",
-                key=f"col_custom_{st.session_state.get('col_counter', 0)}"
+                key=f"col_custom_{idx}"
             )
-            if custom_test:
-                if "tests" not in col:
-                    col["tests"] = []
-                if isinstance(col["tests"], list):
-                    col["tests"].append(custom_test)
 
-    return col
+def collect_columns(count: int) -> List[Dict]:
+    """Build the column configs from the index-keyed widget state."""
+    state = st.session_state
+    columns = []
+    for i in range(count):
+        name = state.get(f"col_name_{i}", "")
+        if not name:  # Only add if name is provided
+            continue
+
+        col = {
+            "name": name,
+            "tests": list(state.get(f"col_tests_{i}", [])),
+            "description": state.get(f"col_desc_{i}", ""),
+        }
+        if state.get(f"col_rel_check_{i}") and state.get(f"col_ref_{i}"):
+            col["tests"].append({
+                "relationships": {
+                    "to": state[f"col_ref_{i}"],
+                    "field": name
+                }
+            })
+        if state.get(f"col_custom_check_{i}") and state.get(f"col_custom_{i}"):
+            col["tests"].append(state[f"col_custom_{i}"])
 
+        columns.append(col)
+    return columns
+
+@st.fragment
 def create_model_config():
-    """Create a complete model configuration using form inputs."""
+    """Create a complete model configuration using form inputs.
+
+    Runs as a fragment so edits inside the form rerun only this function,
+    not the whole page. Widget keys keep the state that the next full
+    rerun (e.g. the submit button) reads back out.
+    """
     config = {}
     
     # Basic model properties
@@ -85,23 +147,19 @@ def create_model_config():
     # Columns configuration
     st.subheader("Columns Configuration")
     
-    if 'columns' not in st.session_state:
-        st.session_state.columns = []
-        st.session_state.col_counter = 0
+    if 'col_count' not in st.session_state:
+        st.session_state.col_count = 0
 
     # Add new column button
     if st.button("Add Column"):
-        st.session_state.col_counter += 1
-        st.session_state.columns.append({})
+        st.session_state.col_count += 1
 
     # Display existing columns
-    columns = []
-    for i, _ in enumerate(st.session_state.columns):
+    for i in range(st.session_state.col_count):
         st.markdown(f"#### Column {i + 1}")
-        col_config = create_column_config()
-        if col_config.get("name"):  # Only add if name is provided
-            columns.append(col_config)
+        create_column_config(i)
 
+    columns = collect_columns(st.session_state.col_count)
     if columns:
         config["columns"] = columns
 
@@ -117,13 +175,14 @@ def create_model_config():
 
         # Custom properties
         if st.checkbox("Add Custom Properties"):
-            custom_props = st.text_area("Custom Properties (YAML format)")
-            try:
-                custom_config = yaml.safe_load(custom_props)
-                if custom_config:
-                    config.update(custom_config)
-            except yaml.YAMLError as e:
-                st.error(f"Invalid YAML format: {str(e)}")
+            custom_props = st.text_area("Custom Properties (YAML or JSON format)")
+            if custom_props:
+                try:
+                    custom_config = parse_custom_props(custom_props)
+                    if custom_config:
+                        config.update(custom_config)
+                except ValueError as e:
+                    st.error(f"Invalid YAML format: {str(e)}")
 
     return config
 
@@ -137,7 +196,7 @@ def main():
         ["View Configurations", "Add Model", "Update Model", "Delete Model"]
     )
 
-    yaml_manager = st.session_state.yaml_manager
+    yaml_manager = get_yaml_manager()
 
     if page == "View Configurations":
         st.header("Current DBT Configurations")
@@ -154,7 +213,7 @@ def main():
         )
 
         if selected_file:
-            config = yaml_manager.load_yaml(selected_file)
+            config = load_config(str(selected_file), selected_file.stat().st_mtime_ns)
             display_yaml(config)
 
     elif page == "Add Model":
@@ -168,9 +227,9 @@ def main():
         # Use the form interface instead of raw YAML input
         config = create_model_config()
         
-        # Preview the generated YAML
-        if config:
-            st.subheader("Preview Generated YAML")
+        # Preview the generated YAML; only emit when the preview is open so
+        # reruns with a hidden preview skip the dump entirely.
+        if config and st.toggle("Preview Generated YAML"):
             display_yaml(config)
 
         if st.button("Add Model"):
@@ -181,11 +240,11 @@ def main():
                     
                 file_name = file_name if file_name else None
                 yaml_manager.create_model(model_name, config, file_name)
+                load_config.clear()
                 st.success(f"Model {model_name} added successfully!")
                 
                 # Reset the form
-                st.session_state.columns = []
-                st.session_state.col_counter = 0
+                st.session_state.col_count = 0
             except Exception as e:
                 st.error(f"Error: {str(e)}")
 
@@ -205,7 +264,7 @@ def main():
         )
 
         if selected_file:
-            config = yaml_manager.load_yaml(selected_file)
+            config = load_config(str(selected_file), selected_file.stat().st_mtime_ns)
             if "models" in config and config["models"]:
                 model_names = [model["name"] for model in config["models"]]
                 selected_model = st.selectbox("Select model to update", model_names)
@@ -224,11 +283,12 @@ def main():
                 
                 if st.button("Update Model"):
                     try:
-                        yaml_manager.update_model(selected_file, selected_model, new_config)
+                        yaml_manager.update_model(selected_file, selected_model, new_config,
+                                                  preloaded=config)
+                        load_config.clear()
                         st.success(f"Model {selected_model} updated successfully!")
                         # Reset the form
-                        st.session_state.columns = []
-                        st.session_state.col_counter = 0
+                        st.session_state.col_count = 0
                     except Exception as e:
                         st.error(f"Error: {str(e)}")
             else:
@@ -250,14 +310,15 @@ def main():
         )
 
         if selected_file:
-            config = yaml_manager.load_yaml(selected_file)
+            config = load_config(str(selected_file), selected_file.stat().st_mtime_ns)
             if "models" in config and config["models"]:
                 model_names = [model["name"] for model in config["models"]]
                 selected_model = st.selectbox("Select model to delete", model_names)
                 
                 if st.button("Delete Model", type="primary"):
                     try:
-                        yaml_manager.delete_model(selected_file, selected_model)
+                        yaml_manager.delete_model(selected_file, selected_model, preloaded=config)
+                        load_config.clear()
                         st.success(f"Model {selected_model} deleted successfully!")
                     except Exception as e:
                         st.error(f"Error: {str(e)}")
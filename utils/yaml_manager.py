@@ -1,35 +1,213 @@
-import yaml
+import copy
+import json
 import os
+from collections import OrderedDict
+from functools import lru_cache
 from typing import Dict, List, Optional, Union
 from pathlib import Path
 
+@lru_cache(maxsize=1)
+def _yaml():
+    """Import PyYAML on first use and resolve its fast codec classes.
+
+    Returns the module together with the libyaml-backed CSafeLoader and
+    CSafeDumper when the C extension is available (same safety guarantees,
+    several times faster), falling back to the pure-Python classes. The
+    lru_cache means the import and getattr lookups happen exactly once,
+    and sessions that never touch YAML skip the import cost entirely.
+    """
+    import yaml
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+    return yaml, loader, dumper
+
+# Schema for a DBT model config file; compiled once at import so validation
+# is a single generated-function call instead of a Python type-check walk.
+_CONFIG_SCHEMA = {
+    "type": "object",
+    "required": ["models"],
+    "properties": {
+        "models": {
+            "type": "array",
+            "items": {"type": "object", "required": ["name"]},
+        }
+    },
+}
+try:
+    import fastjsonschema
+    _validate_config = fastjsonschema.compile(_CONFIG_SCHEMA)
+except ImportError:
+    _validate_config = None
+
 class YAMLManager:
-    def __init__(self, yaml_dir: str):
+    # Maximum number of parsed files kept in the load_yaml cache.
+    CACHE_SIZE = 100
+
+    def __init__(self, yaml_dir: str, one_model_per_file: bool = False):
         self.yaml_dir = Path(yaml_dir)
         self.yaml_dir.mkdir(parents=True, exist_ok=True)
-    
+        # When set, writes target {model_name}.yml so re-emitting a change
+        # costs one model's worth of serialization, not the whole file.
+        self.one_model_per_file = one_model_per_file
+        # LRU cache of parsed files: path -> (mtime, size, parsed dict).
+        self._cache: "OrderedDict[str, tuple]" = OrderedDict()
+        # Directory listing cache, validated against the directory mtime.
+        self._dir_mtime: Optional[int] = None
+        self._dir_listing: List[Path] = []
+
+    def _model_path(self, model_name: str) -> Path:
+        """Per-model file path used in one_model_per_file mode."""
+        return self.yaml_dir / f"{model_name}.yml"
+
+    def _redirect_to_model_file(self, file_path: Union[str, Path],
+                                model_name: str) -> Union[str, Path]:
+        """In one_model_per_file mode, prefer the model's own file.
+
+        Falls back to the given path when no per-model file exists yet
+        (e.g. a merged file that has not been split).
+        """
+        if self.one_model_per_file:
+            per_model = self._model_path(model_name)
+            if per_model.exists():
+                return per_model
+        return file_path
+
+    @staticmethod
+    def _model_index(config: Dict) -> Dict[str, int]:
+        """Map model name to its position in config["models"]."""
+        return {m.get("name"): i for i, m in enumerate(config.get("models", []))}
+
+    @staticmethod
+    def _sidecar_path(path: str) -> str:
+        """Path of the JSON sidecar cache written next to a YAML file."""
+        return path + '.json.cache'
+
+    def _cache_store(self, path: str, mtime: float, size: int, data: Dict) -> None:
+        """Insert or refresh a cache entry, evicting the oldest when full."""
+        self._cache[path] = (mtime, size, copy.deepcopy(data))
+        self._cache.move_to_end(path)
+        if len(self._cache) > self.CACHE_SIZE:
+            self._cache.popitem(last=False)
+
     def load_yaml(self, file_path: Union[str, Path]) -> Dict:
-        """Load a YAML file and return its contents."""
+        """Load a YAML file and return its contents.
+
+        Parsed results are cached per path and revalidated against the file's
+        mtime and size, so repeated loads of an unchanged file skip parsing.
+        Callers get a deep copy and can mutate the result freely.
+        """
+        path = str(file_path)
         try:
-            with open(file_path, 'r') as f:
-                return yaml.safe_load(f) or {}
+            stat = os.stat(path)
         except FileNotFoundError:
+            self._cache.pop(path, None)
             return {}
+
+        cached = self._cache.get(path)
+        if cached is not None and cached[0] == stat.st_mtime and cached[1] == stat.st_size:
+            self._cache.move_to_end(path)
+            return copy.deepcopy(cached[2])
+
+        try:
+            data = self._parse_file(path, stat.st_mtime)
+        except FileNotFoundError:
+            return {}
+
+        self._cache_store(path, stat.st_mtime, stat.st_size, data)
+        return data
+
+    def _parse_file(self, path: str, mtime: float) -> Dict:
+        """Parse a config file, preferring the faster JSON representation.
+
+        Native ``.json`` files go straight through the stdlib parser. YAML
+        files are read from their JSON sidecar cache when it is at least as
+        new as the YAML itself, and fall back to the YAML parser otherwise.
+        """
+        if path.endswith('.json'):
+            try:
+                with open(path, 'rb') as f:
+                    return json.load(f) or {}
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Error parsing JSON file: {e}")
+
+        sidecar = self._sidecar_path(path)
+        try:
+            if os.stat(sidecar).st_mtime >= mtime:
+                with open(sidecar, 'rb') as f:
+                    return json.load(f) or {}
+        except (FileNotFoundError, json.JSONDecodeError):
+            pass
+
+        yaml, loader, _ = _yaml()
+        try:
+            with open(path, 'rb') as f:
+                return yaml.load(f, Loader=loader) or {}
         except yaml.YAMLError as e:
             raise ValueError(f"Error parsing YAML file: {e}")
 
     def save_yaml(self, data: Dict, file_path: Union[str, Path]) -> None:
-        """Save data to a YAML file."""
-        with open(file_path, 'w') as f:
-            yaml.dump(data, f, sort_keys=False, indent=2)
+        """Save data to a config file, JSON or YAML depending on extension.
+
+        YAML files also get a JSON sidecar cache so later cold loads can
+        skip the YAML parser entirely.
+        """
+        path = str(file_path)
+        if path.endswith('.json'):
+            self._atomic_write(path, json.dumps(data, indent=2).encode())
+        else:
+            yaml, _, dumper = _yaml()
+            buf = yaml.dump(data, Dumper=dumper, sort_keys=False, indent=2).encode()
+            # Prepare the sidecar before touching disk; it is only an
+            # optimization and must never fail the save or serve data that
+            # differs from the YAML (e.g. datetime.date values or non-string
+            # keys, which json drops or coerces).
+            try:
+                sidecar_payload = json.dumps(data).encode()
+                if json.loads(sidecar_payload) != data:
+                    sidecar_payload = None
+            except TypeError:
+                sidecar_payload = None
+            self._atomic_write(path, buf)
+            if sidecar_payload is not None:
+                self._atomic_write(self._sidecar_path(path), sidecar_payload)
+        stat = os.stat(path)
+        self._cache_store(path, stat.st_mtime, stat.st_size, data)
+
+    @staticmethod
+    def _atomic_write(path: str, payload: bytes) -> None:
+        """Write bytes to a temp file in the same directory, then rename.
+
+        os.replace is atomic on POSIX and Windows, so readers never observe
+        a partially written file and mtime-based caches stay trustworthy.
+        """
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp, path)
 
     def get_all_yaml_files(self) -> List[Path]:
-        """Get all YAML files in the directory."""
-        return list(self.yaml_dir.glob("*.yml")) + list(self.yaml_dir.glob("*.yaml"))
+        """Get all YAML files in the directory.
+
+        The listing is cached and reused until the directory mtime changes,
+        so repeated calls on an unchanged directory avoid rescanning.
+        """
+        dir_mtime = os.stat(self.yaml_dir).st_mtime_ns
+        if dir_mtime != self._dir_mtime:
+            with os.scandir(self.yaml_dir) as entries:
+                self._dir_listing = [
+                    Path(entry.path) for entry in entries
+                    if entry.is_file() and entry.name.endswith(('.yml', '.yaml'))
+                ]
+            self._dir_mtime = dir_mtime
+        return list(self._dir_listing)
 
     def create_model(self, model_name: str, config: Dict, file_name: Optional[str] = None) -> str:
-        """Create a new DBT model configuration."""
-        if file_name is None:
+        """Create a new DBT model configuration.
+
+        In one_model_per_file mode, the model always goes to its own
+        {model_name}.yml file and ``file_name`` is ignored.
+        """
+        if self.one_model_per_file or file_name is None:
             file_name = f"{model_name}.yml"
         
         file_path = self.yaml_dir / file_name
@@ -37,59 +215,113 @@ class YAMLManager:
         
         if "models" not in existing_config:
             existing_config["models"] = []
-        
+
         # Check if model already exists
-        for model in existing_config["models"]:
-            if model.get("name") == model_name:
-                raise ValueError(f"Model {model_name} already exists in {file_name}")
-        
+        if model_name in self._model_index(existing_config):
+            raise ValueError(f"Model {model_name} already exists in {file_name}")
+
         existing_config["models"].append({"name": model_name, **config})
         self.save_yaml(existing_config, file_path)
         return str(file_path)
 
-    def update_model(self, file_path: Union[str, Path], model_name: str, new_config: Dict) -> None:
-        """Update an existing model configuration."""
-        config = self.load_yaml(file_path)
+    def update_model(self, file_path: Union[str, Path], model_name: str, new_config: Dict,
+                     preloaded: Optional[Dict] = None) -> None:
+        """Update an existing model configuration.
+
+        Callers that already hold the parsed file can pass it as
+        ``preloaded`` to skip the internal load.
+        """
+        redirected = self._redirect_to_model_file(file_path, model_name)
+        if redirected is not file_path:
+            file_path, preloaded = redirected, None
+        config = preloaded if preloaded is not None else self.load_yaml(file_path)
         
         if "models" not in config:
             raise ValueError(f"No models found in {file_path}")
-        
-        for i, model in enumerate(config["models"]):
-            if model.get("name") == model_name:
-                config["models"][i] = {"name": model_name, **new_config}
-                self.save_yaml(config, file_path)
-                return
-        
-        raise ValueError(f"Model {model_name} not found in {file_path}")
 
-    def delete_model(self, file_path: Union[str, Path], model_name: str) -> None:
-        """Delete a model from the configuration."""
-        config = self.load_yaml(file_path)
+        i = self._model_index(config).get(model_name)
+        if i is None:
+            raise ValueError(f"Model {model_name} not found in {file_path}")
+
+        config["models"][i] = {"name": model_name, **new_config}
+        self.save_yaml(config, file_path)
+
+    def delete_model(self, file_path: Union[str, Path], model_name: str,
+                     preloaded: Optional[Dict] = None) -> None:
+        """Delete a model from the configuration.
+
+        Accepts an already-parsed file via ``preloaded``, like update_model.
+        """
+        redirected = self._redirect_to_model_file(file_path, model_name)
+        if redirected is not file_path:
+            file_path, preloaded = redirected, None
+        config = preloaded if preloaded is not None else self.load_yaml(file_path)
         
         if "models" not in config:
             raise ValueError(f"No models found in {file_path}")
-        
+
+        # Bail out before the filter and re-emit when there is nothing to do.
+        if model_name not in self._model_index(config):
+            raise ValueError(f"Model {model_name} not found in {file_path}")
+
         config["models"] = [m for m in config["models"] if m.get("name") != model_name]
         
         if not config["models"]:
             # If file is empty, delete it
             Path(file_path).unlink()
+            Path(self._sidecar_path(str(file_path))).unlink(missing_ok=True)
+            self._cache.pop(str(file_path), None)
         else:
             self.save_yaml(config, file_path)
 
+    def split_models(self) -> List[str]:
+        """One-shot migration for one_model_per_file mode.
+
+        Rewrites every merged file (more than one model) into per-model
+        {model_name}.yml files and removes the merged original. Returns the
+        paths that were written.
+        """
+        written = []
+        for path in self.get_all_yaml_files():
+            config = self.load_yaml(path)
+            models = config.get("models", [])
+            if len(models) <= 1:
+                continue
+
+            targets = set()
+            for model in models:
+                target = self._model_path(model["name"])
+                self.save_yaml({"models": [model]}, target)
+                targets.add(target)
+                written.append(str(target))
+
+            if path not in targets:
+                path.unlink()
+                Path(self._sidecar_path(str(path))).unlink(missing_ok=True)
+                self._cache.pop(str(path), None)
+        return written
+
     def validate_yaml(self, data: Dict) -> bool:
         """Validate YAML structure for DBT configuration."""
+        if _validate_config is not None:
+            try:
+                _validate_config(data)
+                return True
+            except fastjsonschema.JsonSchemaException:
+                return False
+
+        # Fallback walk when fastjsonschema is not installed.
         if not isinstance(data, dict):
             return False
-        
+
         if "models" not in data:
             return False
-        
+
         if not isinstance(data["models"], list):
             return False
-        
+
         for model in data["models"]:
             if not isinstance(model, dict) or "name" not in model:
                 return False
-        
+
         return True 
\ No newline at end of file